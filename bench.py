@@ -0,0 +1,41 @@
+"""Time parse_cpp_tokens on a token file.
+
+    python bench.py [token_file] [runs]
+
+The first few runs are warm-up and are not timed. Under PyPy they give the
+JIT a chance to compile the parser's hot loops before measuring; on
+CPython they just warm the file cache. The same script times the Cython
+build of cpp_parser when one has been built.
+"""
+import platform
+import sys
+import time
+
+import cpp_parser
+
+WARMUP_RUNS = 5
+
+
+def bench(filename, runs):
+    for _ in range(WARMUP_RUNS):
+        cpp_parser.parse_cpp_tokens(filename)
+    
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        is_valid, errors = cpp_parser.parse_cpp_tokens(filename)
+        times.append(time.perf_counter() - start)
+    
+    return is_valid, errors, times
+
+
+if __name__ == "__main__":
+    filename = sys.argv[1] if len(sys.argv) > 1 else "text.txt"
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    
+    is_valid, errors, times = bench(filename, runs)
+    build = "source" if cpp_parser.__file__.endswith(".py") else "compiled"
+    
+    print(f"{platform.python_implementation()} {platform.python_version()}, cpp_parser {build}")
+    print(f"{filename}: {'valid' if is_valid else f'{len(errors)} error(s)'}")
+    print(f"best {min(times) * 1000:.2f} ms, mean {sum(times) / len(times) * 1000:.2f} ms over {runs} runs")
@@ -0,0 +1,49 @@
+# Static types for compiling cpp_parser.py with Cython (see setup.py).
+
+cdef class Token:
+    cdef public str type
+    cdef public str value
+    cdef public int type_id
+    cdef public int value_id
+
+
+cdef class Parser:
+    cdef public list tokens
+    cdef signed char[:] type_ids
+    cdef signed char[:] value_ids
+    cdef public Py_ssize_t n
+    cdef public Py_ssize_t pos
+    cdef public int depth
+    cdef public list errors
+    cdef public object max_errors
+    cdef public bint has_main
+    cdef public list stmt_dispatch
+
+    cpdef object current_token(self)
+    cpdef object peek_token(self, Py_ssize_t offset=*)
+    cpdef bint consume(self, expected_type=*, expected_value=*)
+    cpdef bint expect(self, expected_type=*, expected_value=*, error_msg=*)
+    cpdef bint expect_value(self, int expected_type, int expected_value)
+    cpdef add_error(self, message)
+    cpdef list format_errors(self)
+    cpdef bint parse(self)
+    cpdef program(self)
+    cpdef bint global_declaration(self)
+    cpdef bint global_variable(self)
+    cpdef bint func(self)
+    cpdef bint datatype(self)
+    cpdef bint block(self)
+    cpdef bint x(self)
+    cpdef bint assign_or_func(self)
+    cpdef bint assign(self)
+    cpdef bint expression_statement(self)
+    cpdef bint expression(self)
+    cpdef bint binary_expr(self, int min_prec)
+    cpdef bint unary_expr(self)
+    cpdef bint postfix_expr(self)
+    cpdef bint argument_list(self)
+    cpdef bint primary_expr(self)
+    cpdef bint if_statement(self)
+    cpdef bint while_statement(self)
+    cpdef bint for_statement(self)
+    cpdef bint return_statement(self)
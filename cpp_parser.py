@@ -1,121 +1,263 @@
+import re
+from array import array
+
+try:
+    import cython
+except ImportError:
+    # Cython is only needed for the optional native build (see setup.py).
+    COMPILED = False
+else:
+    COMPILED = cython.compiled
+
+# Token types and the values the grammar cares about are interned to small
+# integers when a token is created, so the parser compares ints instead of
+# strings. Value ids stay below 64 so a set of values fits in one bitmask.
+TYPE_NAMES = ('KEYWORD', 'IDENTIFIER', 'OPERATOR', 'SPECIAL CHARACTER', 'NUMBER', 'STRING')
+TYPE_IDS = {name: i for i, name in enumerate(TYPE_NAMES)}
+T_KEYWORD, T_IDENTIFIER, T_OPERATOR, T_SPECIAL, T_NUMBER, T_STRING = range(len(TYPE_NAMES))
+T_OTHER = len(TYPE_NAMES)
+T_EOF = T_OTHER + 1
+
+VALUE_NAMES = (
+    None, 'int', 'float', 'double', 'char', 'if', 'while', 'for', 'return', 'else', 'main',
+    '(', ')', '{', '}', ';', ',', '=', '==', '!=', '<', '>', '<=', '>=',
+    '+', '-', '*', '/', '%', '||', '&&', '++', '--', '!', '[', ']',
+)
+VALUE_IDS = {name: i for i, name in enumerate(VALUE_NAMES) if name is not None}
+(V_OTHER, V_INT, V_FLOAT, V_DOUBLE, V_CHAR, V_IF, V_WHILE, V_FOR, V_RETURN, V_ELSE, V_MAIN,
+ V_LPAREN, V_RPAREN, V_LBRACE, V_RBRACE, V_SEMI, V_COMMA, V_ASSIGN, V_EQ, V_NE, V_LT, V_GT, V_LE, V_GE,
+ V_PLUS, V_MINUS, V_STAR, V_SLASH, V_PERCENT, V_OR, V_AND, V_INC, V_DEC, V_NOT,
+ V_LBRACKET, V_RBRACKET) = range(len(VALUE_NAMES))
+
+# The parts of the grammar that are lists of alternatives are written down
+# as data here, by spelling, and compiled into id-indexed tables below.
+DATATYPES = ('int', 'float', 'double', 'char')
+UNARY_OPERATORS = ('+', '-', '++', '--', '!')
+POSTFIX_OPERATORS = ('++', '--')
+
+# Binary operators, one tuple per precedence level from loosest to tightest.
+BINARY_LEVELS = (
+    ('||',),
+    ('&&',),
+    ('==', '!='),
+    ('<', '>', '<=', '>='),
+    ('+', '-'),
+    ('*', '/', '%'),
+)
+
+# Statement keywords and the Parser method that parses each one.
+STATEMENT_KEYWORDS = {
+    'int': 'assign_or_func',
+    'float': 'assign_or_func',
+    'double': 'assign_or_func',
+    'char': 'assign_or_func',
+    'if': 'if_statement',
+    'while': 'while_statement',
+    'for': 'for_statement',
+    'return': 'return_statement',
+}
+
+def _value_mask(values):
+    mask = 0
+    for value in values:
+        mask |= 1 << VALUE_IDS[value]
+    return mask
+
+def _binary_precedence(levels):
+    prec = [0] * len(VALUE_NAMES)
+    for level, operators in enumerate(levels, 1):
+        for operator in operators:
+            prec[VALUE_IDS[operator]] = level
+    return tuple(prec)
+
+# Sets of ids as bitmasks, tested as (MASK >> id) & 1. Shifting the mask
+# rather than 1 keeps the arithmetic on Python ints in the Cython build,
+# where ids read from the typed arrays are C chars.
+DATATYPE_MASK = _value_mask(DATATYPES)
+UNARY_MASK = _value_mask(UNARY_OPERATORS)
+POSTFIX_MASK = _value_mask(POSTFIX_OPERATORS)
+NAME_TYPE_MASK = (1 << T_IDENTIFIER) | (1 << T_KEYWORD)
+
+# Precedence of each binary operator, indexed by value id; 0 for values that
+# are not binary operators. Higher binds tighter.
+BINARY_PREC = _binary_precedence(BINARY_LEVELS)
+
+# Limit on nested statements and expressions. The pure Python parser hits
+# the interpreter's recursion limit well before this; the Cython build has
+# no such check and would otherwise overflow the C stack.
+MAX_NESTING = 1000
+
 class Token:
+    __slots__ = ('type', 'value', 'type_id', 'value_id')
+    
     def __init__(self, token_type, value):
         self.type = token_type
         self.value = value
+        self.type_id = TYPE_IDS.get(token_type, T_OTHER)
+        self.value_id = VALUE_IDS.get(value, V_OTHER)
     
     def __repr__(self):
         return f"Token({self.type}, {self.value})"
 
+# Appended after the real tokens so the parser always has a token to look
+# at and never needs to check for running off the end of the list.
+EOF_TOKEN = Token('EOF', '')
+EOF_TOKEN.type_id = T_EOF
+
+# One token per line, written as <TYPE, value>. The type runs up to the
+# first comma; the value may itself contain ',' or '>' (e.g. <OPERATOR, >>).
+# The whole file is scanned at once, so the pattern is anchored per line.
+_TOKEN_RE = re.compile(r'^[^\S\n]*<([^,\n]*,.*)>[^\S\n]*$', re.M)
+
 def read_tokens_from_file(filename):
-    tokens = []
-    
     with open(filename, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            
-            if line.startswith('<') and line.endswith('>'):
-                content = line[1:-1]
-                parts = content.split(',', 1)
-                
-                if len(parts) == 2:
-                    token_type = parts[0].strip()
-                    value = parts[1].strip()
-                    tokens.append(Token(token_type, value))
+        matches = _TOKEN_RE.findall(f.read())
+    
+    # A program repeats the same few hundred tokens, so each distinct line
+    # is split and turned into a Token once and that Token is shared by
+    # every occurrence. Tokens are never modified after they are created.
+    tokens = {}
+    for text in set(matches):
+        token_type, value = text.split(',', 1)
+        tokens[text] = Token(token_type.strip(), value.strip())
     
-    return tokens
+    return list(map(tokens.__getitem__, matches))
+
+class ErrorLimitReached(Exception):
+    """Raised by Parser.add_error to stop parsing once max_errors is reached."""
 
 class Parser:
-    def __init__(self, tokens):
-        self.tokens = tokens
+    __slots__ = ('tokens', 'type_ids', 'value_ids', 'n', 'pos', 'depth', 'errors', 'max_errors', 'has_main', 'stmt_dispatch')
+    
+    def __init__(self, tokens, max_errors=None):
+        # Any iterable of tokens works; it is copied into the list the
+        # parser indexes. Two sentinels follow the real tokens because
+        # productions look at most two tokens ahead.
+        self.tokens = list(tokens)
+        self.n = len(self.tokens)
+        self.tokens += (EOF_TOKEN, EOF_TOKEN)
+        
+        # Productions only look at the interned ids, so those are copied
+        # into two flat sequences; the Token objects are kept for error text.
+        # Pure Python indexes plain lists fastest. The Cython build types the
+        # ids as signed char memoryviews, which need arrays.
+        type_ids = [token.type_id for token in self.tokens]
+        value_ids = [token.value_id for token in self.tokens]
+        if COMPILED:
+            type_ids = array('b', type_ids)
+            value_ids = array('b', value_ids)
+        self.type_ids = type_ids
+        self.value_ids = value_ids
         self.pos = 0
+        self.depth = 0
         self.errors = []
+        # None collects every error; a number stops the parse at that many,
+        # which for max_errors=1 skips all work past the first error.
+        if max_errors is not None and max_errors < 1:
+            raise ValueError(f"max_errors must be at least 1, got {max_errors}")
+        self.max_errors = max_errors
         self.has_main = False
+        
+        # Statement handlers for keyword tokens, indexed by value id.
+        self.stmt_dispatch = [None] * len(VALUE_NAMES)
+        for keyword, method in STATEMENT_KEYWORDS.items():
+            self.stmt_dispatch[VALUE_IDS[keyword]] = getattr(self, method)
     
     def current_token(self):
-        if self.pos < len(self.tokens):
-            return self.tokens[self.pos]
-        return None
+        return self.tokens[self.pos]
     
     def peek_token(self, offset=1):
-        if self.pos + offset < len(self.tokens):
+        if self.pos + offset < self.n:
             return self.tokens[self.pos + offset]
-        return None
+        return EOF_TOKEN
     
     def consume(self, expected_type=None, expected_value=None):
-        token = self.current_token()
-        if not token:
+        type_id = self.type_ids[self.pos]
+        value_id = self.value_ids[self.pos]
+        if type_id == T_EOF:
             return False
         
-        if expected_type and token.type != expected_type:
+        if expected_type is not None and type_id != expected_type:
             return False
         
-        if expected_value and token.value != expected_value:
+        if expected_value is not None and value_id != expected_value:
             return False
         
         self.pos += 1
         return True
     
     def expect(self, expected_type=None, expected_value=None, error_msg=None):
-        token = self.current_token()
+        type_id = self.type_ids[self.pos]
+        value_id = self.value_ids[self.pos]
         
-        if not token:
+        if type_id == T_EOF:
             self.add_error(error_msg or "Unexpected end of file")
             return False
         
-        if expected_type and token.type != expected_type:
-            self.add_error(error_msg or f"Expected type {expected_type}, got {token.type}")
+        if expected_type is not None and type_id != expected_type:
+            self.add_error(error_msg or f"Expected type {TYPE_NAMES[expected_type]}, got {self.tokens[self.pos].type}")
             return False
         
-        if expected_value and token.value != expected_value:
-            self.add_error(error_msg or f"Expected '{expected_value}', got '{token.value}'")
+        if expected_value is not None and value_id != expected_value:
+            self.add_error(error_msg or f"Expected '{VALUE_NAMES[expected_value]}', got '{self.tokens[self.pos].value}'")
             return False
         
         self.pos += 1
         return True
     
+    def expect_value(self, expected_type, expected_value):
+        # Both checks in one test on the success path; expect() runs again
+        # only to report the error.
+        pos = self.pos
+        if self.type_ids[pos] == expected_type and self.value_ids[pos] == expected_value:
+            self.pos = pos + 1
+            return True
+        return self.expect(expected_type, expected_value)
+    
     def add_error(self, message):
-        token = self.current_token()
-        if token:
-            self.errors.append(f"At token {self.pos} ({token.type}, {token.value}): {message}")
-        else:
-            self.errors.append(f"At end of file: {message}")
+        # Only the position is recorded here; format_errors builds the
+        # message text once parsing is over.
+        self.errors.append((self.pos, message))
+        if len(self.errors) == self.max_errors:
+            raise ErrorLimitReached
+    
+    def format_errors(self):
+        messages = []
+        for pos, message in self.errors:
+            token = self.tokens[pos]
+            if token.type_id != T_EOF:
+                messages.append(f"At token {pos} ({token.type}, {token.value}): {message}")
+            else:
+                messages.append(f"At end of file: {message}")
+        return messages
     
     def parse(self):
+        # Other exceptions (e.g. RecursionError on absurdly deep nesting)
+        # are left to the caller; parse_cpp_tokens reports them.
         try:
             self.program()
             
             if not self.has_main:
                 self.add_error("Missing main function")
                 return False
-            
-            return len(self.errors) == 0
-        except Exception as e:
-            self.add_error(f"Parser exception: {str(e)}")
+        except ErrorLimitReached:
             return False
+        
+        return len(self.errors) == 0
     
     def global_declaration(self):
-        token = self.current_token()
-        if not token:
-            return False
+        type_ids = self.type_ids
+        pos = self.pos
         
-        if not (token.type == 'KEYWORD' and token.value in ['int', 'float', 'double', 'char']):
+        if not (type_ids[pos] == T_KEYWORD and (DATATYPE_MASK >> self.value_ids[pos]) & 1):
             self.add_error("Expected datatype for global declaration")
             return False
         
-        next_token = self.peek_token(1)
-        next_next = self.peek_token(2)
-        
-        if not next_token:
-            self.add_error("Expected identifier after datatype")
-            return False
-        
-        if next_token.type not in ['IDENTIFIER', 'KEYWORD']:
+        if not (NAME_TYPE_MASK >> type_ids[pos + 1]) & 1:
             self.add_error("Expected identifier after datatype")
             return False
         
-        if next_next and next_next.type == 'SPECIAL CHARACTER' and next_next.value == '(':
+        if type_ids[pos + 2] == T_SPECIAL and self.value_ids[pos + 2] == V_LPAREN:
             return self.func()
         else:
             return self.global_variable()
@@ -123,82 +265,84 @@ class Parser:
     def global_variable(self):
         self.pos += 1
         
-        if not self.expect('IDENTIFIER'):
+        if not self.expect(T_IDENTIFIER):
             return False
         
-        token = self.current_token()
+        type_id = self.type_ids[self.pos]
+        value_id = self.value_ids[self.pos]
         
-        if token and token.type == 'OPERATOR' and token.value == '=':
+        if type_id == T_OPERATOR and value_id == V_ASSIGN:
             self.pos += 1
             self.expression()
-            token = self.current_token()
+            type_id = self.type_ids[self.pos]
+            value_id = self.value_ids[self.pos]
         
-        while token and token.type == 'SPECIAL CHARACTER' and token.value == ',':
+        while type_id == T_SPECIAL and value_id == V_COMMA:
             self.pos += 1
-            if not self.expect('IDENTIFIER'):
+            if not self.expect(T_IDENTIFIER):
                 return False
-            token = self.current_token()
+            type_id = self.type_ids[self.pos]
+            value_id = self.value_ids[self.pos]
             
-            if token and token.type == 'OPERATOR' and token.value == '=':
+            if type_id == T_OPERATOR and value_id == V_ASSIGN:
                 self.pos += 1
                 self.expression()
-                token = self.current_token()
+                type_id = self.type_ids[self.pos]
+                value_id = self.value_ids[self.pos]
         
-        if not self.expect('SPECIAL CHARACTER', ';'):
+        if not self.expect_value(T_SPECIAL, V_SEMI):
             return False
         
         return True
     
     def program(self):
-        while self.current_token():
+        while self.type_ids[self.pos] != T_EOF:
             if not self.global_declaration():
                 break
     
     def func(self):
-        token = self.current_token()
-        if not token:
-            return False
-        
         if not self.datatype():
             return False
         
-        token = self.current_token()
-        if not token or token.type not in ['IDENTIFIER', 'KEYWORD']:
+        type_id = self.type_ids[self.pos]
+        if not (NAME_TYPE_MASK >> type_id) & 1:
             self.add_error("Expected function identifier")
             return False
         
-        if token.value == 'main':
+        if self.value_ids[self.pos] == V_MAIN:
             self.has_main = True
         
         self.pos += 1
         
-        if not self.expect('SPECIAL CHARACTER', '('):
+        if not self.expect_value(T_SPECIAL, V_LPAREN):
             return False
         
-        if not self.expect('SPECIAL CHARACTER', ')'):
+        if not self.expect_value(T_SPECIAL, V_RPAREN):
             return False
         
         return self.block()
     
     def datatype(self):
-        token = self.current_token()
-        if token and token.type == 'KEYWORD' and token.value in ['int', 'float', 'double', 'char']:
+        type_id = self.type_ids[self.pos]
+        value_id = self.value_ids[self.pos]
+        if type_id == T_KEYWORD and (DATATYPE_MASK >> value_id) & 1:
             self.pos += 1
             return True
         return False
     
     def block(self):
-        if not self.expect('SPECIAL CHARACTER', '{'):
+        if not self.expect_value(T_SPECIAL, V_LBRACE):
             return False
         
         while True:
-            token = self.current_token()
+            type_id = self.type_ids[self.pos]
+            value_id = self.value_ids[self.pos]
             
-            if not token:
+            if type_id == T_EOF:
                 self.add_error("Expected '}' to close block")
                 return False
             
-            if token.type == 'SPECIAL CHARACTER' and token.value == '}':
+            if type_id == T_SPECIAL and value_id == V_RBRACE:
                 self.pos += 1
                 return True
             
@@ -209,168 +353,115 @@ class Parser:
         return True
     
     def x(self):
-        token = self.current_token()
-        
-        if not token:
-            return False
-        
-        if token.type == 'KEYWORD' and token.value in ['int', 'float', 'double', 'char']:
-            next_token = self.peek_token(1)
-            next_next = self.peek_token(2)
-            
-            if next_next and next_next.type == 'SPECIAL CHARACTER' and next_next.value == '(':
-                return self.func()
+        self.depth += 1
+        if self.depth > MAX_NESTING:
+            raise RecursionError("maximum recursion depth exceeded")
+        
+        pos = self.pos
+        type_id = self.type_ids[pos]
+        ok = False
+        
+        if type_id == T_KEYWORD:
+            handler = self.stmt_dispatch[self.value_ids[pos]]
+            if handler is not None:
+                ok = handler()
+        
+        elif type_id == T_IDENTIFIER:
+            if self.type_ids[pos + 1] == T_OPERATOR and self.value_ids[pos + 1] == V_ASSIGN:
+                ok = self.assign()
             else:
-                return self.assign()
+                ok = self.expression_statement()
         
-        if token.type == 'KEYWORD' and token.value == 'if':
-            return self.if_statement()
-        
-        if token.type == 'KEYWORD' and token.value == 'while':
-            return self.while_statement()
-        
-        if token.type == 'KEYWORD' and token.value == 'for':
-            return self.for_statement()
-        
-        if token.type == 'KEYWORD' and token.value == 'return':
-            return self.return_statement()
-        
-        if token.type == 'IDENTIFIER':
-            next_token = self.peek_token(1)
-            if next_token and next_token.type == 'OPERATOR' and next_token.value == '=':
-                return self.assign()
-            else:
-                return self.expression_statement()
+        self.depth -= 1
+        return ok
+    
+    def assign_or_func(self):
+        pos = self.pos + 2
         
-        return False
+        if self.type_ids[pos] == T_SPECIAL and self.value_ids[pos] == V_LPAREN:
+            return self.func()
+        else:
+            return self.assign()
     
     def assign(self):
-        token = self.current_token()
+        type_id = self.type_ids[self.pos]
+        value_id = self.value_ids[self.pos]
         
         has_datatype = False
-        if token.type == 'KEYWORD' and token.value in ['int', 'float', 'double', 'char']:
+        if type_id == T_KEYWORD and (DATATYPE_MASK >> value_id) & 1:
             self.pos += 1
             has_datatype = True
         
-        if not self.expect('IDENTIFIER'):
+        if not self.expect(T_IDENTIFIER):
             return False
         
-        token = self.current_token()
+        type_id = self.type_ids[self.pos]
+        value_id = self.value_ids[self.pos]
         
         if has_datatype:
-            while token and token.type == 'SPECIAL CHARACTER' and token.value == ',':
+            while type_id == T_SPECIAL and value_id == V_COMMA:
                 self.pos += 1
-                if not self.expect('IDENTIFIER'):
+                if not self.expect(T_IDENTIFIER):
                     return False
-                token = self.current_token()
+                type_id = self.type_ids[self.pos]
+                value_id = self.value_ids[self.pos]
                 
-                if token and token.type == 'OPERATOR' and token.value == '=':
+                if type_id == T_OPERATOR and value_id == V_ASSIGN:
                     self.pos += 1
                     self.expression()
-                    token = self.current_token()
+                    type_id = self.type_ids[self.pos]
+                    value_id = self.value_ids[self.pos]
         
-        if token and token.type == 'OPERATOR' and token.value == '=':
+        if type_id == T_OPERATOR and value_id == V_ASSIGN:
             self.pos += 1
             self.expression()
         
-        if not self.expect('SPECIAL CHARACTER', ';'):
+        if not self.expect_value(T_SPECIAL, V_SEMI):
             return False
         
         return True
     
     def expression_statement(self):
         self.expression()
-        if not self.expect('SPECIAL CHARACTER', ';'):
+        if not self.expect_value(T_SPECIAL, V_SEMI):
             return False
         return True
     
     def expression(self):
-        return self.logical_or_expr()
-    
-    def logical_or_expr(self):
-        self.logical_and_expr()
-        
-        while True:
-            token = self.current_token()
-            if token and token.type == 'OPERATOR' and token.value == '||':
-                self.pos += 1
-                self.logical_and_expr()
-            else:
-                break
-        
+        # Not memoized: the parser never backtracks, so an expression is
+        # only re-entered at the same position while recovering from an
+        # error, and there the repeated error report is wanted.
+        self.depth += 1
+        if self.depth > MAX_NESTING:
+            raise RecursionError("maximum recursion depth exceeded")
+        
+        self.binary_expr(1)
+        self.depth -= 1
         return True
     
-    def logical_and_expr(self):
-        self.equality_expr()
-        
-        while True:
-            token = self.current_token()
-            if token and token.type == 'OPERATOR' and token.value == '&&':
-                self.pos += 1
-                self.equality_expr()
-            else:
-                break
-        
-        return True
-    
-    def equality_expr(self):
-        self.relational_expr()
-        
-        while True:
-            token = self.current_token()
-            if token and token.type == 'OPERATOR' and token.value in ['==', '!=']:
-                self.pos += 1
-                self.relational_expr()
-            else:
-                break
-        
-        return True
-    
-    def relational_expr(self):
-        self.additive_expr()
-        
-        while True:
-            token = self.current_token()
-            if token and token.type == 'OPERATOR' and token.value in ['<', '>', '<=', '>=']:
-                self.pos += 1
-                self.additive_expr()
-            else:
-                break
-        
-        return True
-    
-    def additive_expr(self):
-        self.multiplicative_expr()
-        
-        while True:
-            token = self.current_token()
-            if token and token.type == 'OPERATOR' and token.value in ['+', '-']:
-                self.pos += 1
-                self.multiplicative_expr()
-            else:
-                break
-        
-        return True
-    
-    def multiplicative_expr(self):
+    def binary_expr(self, min_prec):
+        # Precedence climbing over BINARY_PREC: parses every binary operator
+        # level with one frame per operand instead of one per level.
         self.unary_expr()
         
         while True:
-            token = self.current_token()
-            if token and token.type == 'OPERATOR' and token.value in ['*', '/', '%']:
-                self.pos += 1
-                self.unary_expr()
-            else:
+            if self.type_ids[self.pos] != T_OPERATOR:
+                break
+            
+            prec = BINARY_PREC[self.value_ids[self.pos]]
+            if prec < min_prec:
                 break
+            
+            self.pos += 1
+            self.binary_expr(prec + 1)
         
         return True
     
     def unary_expr(self):
-        token = self.current_token()
-        
-        if token and token.type == 'OPERATOR' and token.value in ['+', '-', '++', '--', '!']:
+        # Prefix operators are skipped in a loop so a long run of them does
+        # not nest.
+        while self.type_ids[self.pos] == T_OPERATOR and (UNARY_MASK >> self.value_ids[self.pos]) & 1:
             self.pos += 1
-            return self.unary_expr()
         
         return self.postfix_expr()
     
@@ -378,21 +469,20 @@ class Parser:
         self.primary_expr()
         
         while True:
-            token = self.current_token()
-            if not token:
-                break
+            type_id = self.type_ids[self.pos]
+            value_id = self.value_ids[self.pos]
             
-            if token.type == 'SPECIAL CHARACTER' and token.value == '[':
+            if type_id == T_SPECIAL and value_id == V_LBRACKET:
                 self.pos += 1
                 self.expression()
-                self.expect('SPECIAL CHARACTER', ']')
+                self.expect_value(T_SPECIAL, V_RBRACKET)
             
-            elif token.type == 'SPECIAL CHARACTER' and token.value == '(':
+            elif type_id == T_SPECIAL and value_id == V_LPAREN:
                 self.pos += 1
                 self.argument_list()
-                self.expect('SPECIAL CHARACTER', ')')
+                self.expect_value(T_SPECIAL, V_RPAREN)
             
-            elif token.type == 'OPERATOR' and token.value in ['++', '--']:
+            elif type_id == T_OPERATOR and (POSTFIX_MASK >> value_id) & 1:
                 self.pos += 1
             
             else:
@@ -401,16 +491,18 @@ class Parser:
         return True
     
     def argument_list(self):
-        token = self.current_token()
+        type_id = self.type_ids[self.pos]
+        value_id = self.value_ids[self.pos]
         
-        if token and token.type == 'SPECIAL CHARACTER' and token.value == ')':
+        if type_id == T_SPECIAL and value_id == V_RPAREN:
             return True
         
         self.expression()
         
         while True:
-            token = self.current_token()
-            if token and token.type == 'SPECIAL CHARACTER' and token.value == ',':
+            type_id = self.type_ids[self.pos]
+            value_id = self.value_ids[self.pos]
+            if type_id == T_SPECIAL and value_id == V_COMMA:
                 self.pos += 1
                 self.expression()
             else:
@@ -419,57 +511,61 @@ class Parser:
         return True
     
     def primary_expr(self):
-        token = self.current_token()
-        
-        if not token:
-            self.add_error("Unexpected end of file in expression")
-            return False
+        type_id = self.type_ids[self.pos]
+        value_id = self.value_ids[self.pos]
         
-        if token.type == 'IDENTIFIER':
+        if type_id == T_IDENTIFIER:
             self.pos += 1
             return True
         
-        if token.type == 'NUMBER':
+        if type_id == T_NUMBER:
             self.pos += 1
             return True
         
-        if token.type == 'STRING':
+        if type_id == T_STRING:
             self.pos += 1
             return True
         
-        if token.type == 'SPECIAL CHARACTER' and token.value == '(':
+        if type_id == T_SPECIAL and value_id == V_LPAREN:
             self.pos += 1
             self.expression()
-            if not self.expect('SPECIAL CHARACTER', ')'):
+            if not self.expect_value(T_SPECIAL, V_RPAREN):
                 return False
             return True
         
-        self.add_error(f"Unexpected token in expression: {token.type} '{token.value}'")
+        if type_id == T_EOF:
+            self.add_error("Unexpected end of file in expression")
+        else:
+            token = self.tokens[self.pos]
+            self.add_error(f"Unexpected token in expression: {token.type} '{token.value}'")
         return False
     
     def if_statement(self):
         self.pos += 1
         
-        if not self.expect('SPECIAL CHARACTER', '('):
+        if not self.expect_value(T_SPECIAL, V_LPAREN):
             return False
         
         self.expression()
         
-        if not self.expect('SPECIAL CHARACTER', ')'):
+        if not self.expect_value(T_SPECIAL, V_RPAREN):
             return False
         
-        token = self.current_token()
-        if token and token.type == 'SPECIAL CHARACTER' and token.value == '{':
+        type_id = self.type_ids[self.pos]
+        value_id = self.value_ids[self.pos]
+        if type_id == T_SPECIAL and value_id == V_LBRACE:
             self.block()
         else:
             self.x()
         
-        token = self.current_token()
-        if token and token.type == 'KEYWORD' and token.value == 'else':
+        type_id = self.type_ids[self.pos]
+        value_id = self.value_ids[self.pos]
+        if type_id == T_KEYWORD and value_id == V_ELSE:
             self.pos += 1
             
-            token = self.current_token()
-            if token and token.type == 'SPECIAL CHARACTER' and token.value == '{':
+            type_id = self.type_ids[self.pos]
+            value_id = self.value_ids[self.pos]
+            if type_id == T_SPECIAL and value_id == V_LBRACE:
                 self.block()
             else:
                 self.x()
@@ -479,16 +575,17 @@ class Parser:
     def while_statement(self):
         self.pos += 1
         
-        if not self.expect('SPECIAL CHARACTER', '('):
+        if not self.expect_value(T_SPECIAL, V_LPAREN):
             return False
         
         self.expression()
         
-        if not self.expect('SPECIAL CHARACTER', ')'):
+        if not self.expect_value(T_SPECIAL, V_RPAREN):
             return False
         
-        token = self.current_token()
-        if token and token.type == 'SPECIAL CHARACTER' and token.value == '{':
+        type_id = self.type_ids[self.pos]
+        value_id = self.value_ids[self.pos]
+        if type_id == T_SPECIAL and value_id == V_LBRACE:
             self.block()
         else:
             self.x()
@@ -498,30 +595,33 @@ class Parser:
     def for_statement(self):
         self.pos += 1
         
-        if not self.expect('SPECIAL CHARACTER', '('):
+        if not self.expect_value(T_SPECIAL, V_LPAREN):
             return False
         
-        token = self.current_token()
-        if token and token.type == 'KEYWORD':
+        type_id = self.type_ids[self.pos]
+        if type_id == T_KEYWORD:
             self.assign()
         else:
             self.expression()
-            self.expect('SPECIAL CHARACTER', ';')
+            self.expect_value(T_SPECIAL, V_SEMI)
         
-        token = self.current_token()
-        if token and not (token.type == 'SPECIAL CHARACTER' and token.value == ';'):
+        type_id = self.type_ids[self.pos]
+        value_id = self.value_ids[self.pos]
+        if type_id != T_EOF and not (type_id == T_SPECIAL and value_id == V_SEMI):
             self.expression()
-        self.expect('SPECIAL CHARACTER', ';')
+        self.expect_value(T_SPECIAL, V_SEMI)
         
-        token = self.current_token()
-        if token and not (token.type == 'SPECIAL CHARACTER' and token.value == ')'):
+        type_id = self.type_ids[self.pos]
+        value_id = self.value_ids[self.pos]
+        if type_id != T_EOF and not (type_id == T_SPECIAL and value_id == V_RPAREN):
             self.expression()
         
-        if not self.expect('SPECIAL CHARACTER', ')'):
+        if not self.expect_value(T_SPECIAL, V_RPAREN):
             return False
         
-        token = self.current_token()
-        if token and token.type == 'SPECIAL CHARACTER' and token.value == '{':
+        type_id = self.type_ids[self.pos]
+        value_id = self.value_ids[self.pos]
+        if type_id == T_SPECIAL and value_id == V_LBRACE:
             self.block()
         else:
             self.x()
@@ -531,26 +631,26 @@ class Parser:
     def return_statement(self):
         self.pos += 1
         
-        token = self.current_token()
-        if token and not (token.type == 'SPECIAL CHARACTER' and token.value == ';'):
+        type_id = self.type_ids[self.pos]
+        value_id = self.value_ids[self.pos]
+        if type_id != T_EOF and not (type_id == T_SPECIAL and value_id == V_SEMI):
             self.expression()
         
-        if not self.expect('SPECIAL CHARACTER', ';'):
+        if not self.expect_value(T_SPECIAL, V_SEMI):
             return False
         
         return True
 
-def parse_cpp_tokens(filename):
+def parse_cpp_tokens(filename, max_errors=None):
     try:
-        tokens = read_tokens_from_file(filename)
+        parser = Parser(read_tokens_from_file(filename), max_errors)
         
-        if not tokens:
+        if not parser.n:
             return False, ["No tokens found in file"]
         
-        parser = Parser(tokens)
         is_valid = parser.parse()
         
-        return is_valid, parser.errors
+        return is_valid, parser.format_errors()
     except FileNotFoundError:
         return False, [f"File not found: {filename}"]
     except Exception as e:
@@ -0,0 +1,37 @@
+# Static types for compiling new_parse.py with Cython (see setup.py).
+
+cdef class Parser:
+    cdef public list types
+    cdef public list values
+    cdef public Py_ssize_t n
+    cdef public Py_ssize_t pos
+    cdef public int depth
+    cdef public Py_ssize_t err_count
+    cdef list _err_records
+    cdef public bint has_main
+    cdef dict _kw_stmt
+
+    cpdef object current(self)
+    cpdef object peek(self, Py_ssize_t offset=*)
+    cpdef advance(self)
+    cpdef bint match(self, token_type=*, value=*)
+    cpdef bint consume(self, token_type=*, value=*, error_msg=*)
+    cpdef bint _consume_error(self, token_type, value, error_msg)
+    cpdef bint parse(self)
+    cpdef parse_global_declaration(self)
+    cpdef bint is_function_start(self)
+    cpdef parse_global_variable(self)
+    cpdef parse_function(self)
+    cpdef parse_block(self)
+    cpdef parse_statement(self)
+    cpdef parse_assignment(self)
+    cpdef parse_if_statement(self)
+    cpdef parse_while_statement(self)
+    cpdef parse_for_statement(self)
+    cpdef parse_return_statement(self)
+    cpdef parse_expression(self)
+    cpdef parse_binary(self)
+    cpdef parse_unary(self)
+    cpdef parse_postfix(self)
+    cpdef parse_argument_list(self)
+    cpdef parse_primary(self)
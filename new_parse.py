@@ -1,4 +1,82 @@
+import re
+import sys
+from itertools import compress
+
+
+# Token types, and the token values the grammar matches on, as interned
+# strings. Parser interns the tokens it is given, so it can compare against
+# these with `is`.
+_KW = sys.intern('KEYWORD')
+_ID = sys.intern('IDENTIFIER')
+_OP = sys.intern('OPERATOR')
+_SC = sys.intern('SPECIAL CHARACTER')
+_NUM = sys.intern('NUMBER')
+_STR = sys.intern('STRING')
+
+_IF = sys.intern('if')
+_ELSE = sys.intern('else')
+_WHILE = sys.intern('while')
+_FOR = sys.intern('for')
+_RETURN = sys.intern('return')
+_MAIN = sys.intern('main')
+
+_LPAREN = sys.intern('(')
+_RPAREN = sys.intern(')')
+_LBRACE = sys.intern('{')
+_RBRACE = sys.intern('}')
+_LBRACKET = sys.intern('[')
+_RBRACKET = sys.intern(']')
+_SEMI = sys.intern(';')
+_COMMA = sys.intern(',')
+_ASSIGN = sys.intern('=')
+
+# Value sets the grammar tests membership in.
+_DATATYPES = frozenset({'int', 'float', 'double', 'char'})
+_UNARY = frozenset({'+', '-', '++', '--', '!'})
+_POST = frozenset({'++', '--'})
+_BINARY = frozenset({'||', '&&', '==', '!=', '<', '>', '<=', '>=', '+', '-', '*', '/', '%'})
+_OPERAND_TYPES = frozenset({_ID, _NUM, _STR})
+
+# Token types with no syntactic meaning, dropped when the file is read. This
+# is defensive: scanner.py's NEW LINE branches are unreachable and it emits
+# no such tokens, but a hand-written token file may contain them.
+_SKIP_TYPES = frozenset({'NEW LINE'})
+
+# Nesting limit for the Cython build; see MAX_NESTING in cpp_parser.py.
+MAX_NESTING = 1000
+
+# Error codes. Errors are recorded as (code, args) and only formatted, with
+# ERROR_FORMATS[code] % args, when Parser.errors is read.
+E_CONSUME = 0
+E_CONSUME_EOF = 1
+E_EXPECTED_VALUE = 2
+E_EXPECTED_TYPE = 3
+E_UNEXPECTED = 4
+E_MISSING_MAIN = 5
+E_GLOBAL_DATATYPE = 6
+E_UNCLOSED_BLOCK = 7
+E_INVALID_STATEMENT = 8
+E_EXPRESSION_EOF = 9
+E_EXPRESSION_TOKEN = 10
+
+ERROR_FORMATS = (
+    "At position %d: %s",
+    "At position %d: Unexpected end of file",
+    "At position %d: Expected %s '%s', got %s '%s'",
+    "At position %d: Expected %s, got %s",
+    "At position %d: Unexpected token: %s '%s'",
+    "Missing main function",
+    "Expected datatype for global declaration",
+    "Expected '}' to close block",
+    "Invalid statement starting with %s '%s'",
+    "Unexpected end of file in expression",
+    "Unexpected token in expression: %s '%s'",
+)
+
+
 class Token:
+    __slots__ = ('type', 'value')
+    
     def __init__(self, token_type, value):
         self.type = token_type
         self.value = value
@@ -7,230 +85,286 @@ class Token:
         return f"Token({self.type}, {self.value})"
 
 
+# One token per line, "<TYPE, value>", split at the first comma. Lines that
+# are not wrapped in <...> are ignored; wrapped lines that have no comma are
+# an error, found by _MALFORMED_RE.
+_TOKEN_RE = re.compile(r'^[^\S\n]*<([^,\n]*),(.*)>[^\S\n]*$', re.M)
+_MALFORMED_RE = re.compile(r'^[^\S\n]*<([^,\n]*)>[^\S\n]*$', re.M)
+
+
 def read_tokens_from_file(filename):
-    """Read tokens from file in format: <TYPE, value>"""
-    tokens = []
+    """Read tokens from file in format: <TYPE, value>
+    
+    Returns two parallel lists (types, values), one entry per token.
+    """
     with open(filename, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if line.startswith('<') and line.endswith('>'):
-                content = line[1:-1]
-                token_type, value = content.split(',', 1)
-                tokens.append(Token(token_type.strip(), value.strip()))
-    return tokens
+        data = f.read()
+    
+    matches = _TOKEN_RE.findall(data)
+    # Scanner output is one token per line, so the file is only searched for
+    # malformed tokens when some line did not match.
+    if len(matches) < data.count('\n') + (not data.endswith('\n')):
+        malformed = _MALFORMED_RE.search(data)
+        if malformed:
+            raise ValueError("Malformed token: <%s>" % malformed.group(1).strip())
+    
+    types = [token_type.strip() for token_type, _ in matches]
+    values = [value.strip() for _, value in matches]
+    
+    if not _SKIP_TYPES.isdisjoint(types):
+        keep = [token_type not in _SKIP_TYPES for token_type in types]
+        types = list(compress(types, keep))
+        values = list(compress(values, keep))
+    return types, values
 
 
 class Parser:
-    def __init__(self, tokens):
-        self.tokens = tokens
+    def __init__(self, types, values):
+        # sys.intern maps every spelling to one shared object, so repeated
+        # identifiers cost one reference each and compare by identity.
+        self.types = list(map(sys.intern, types))
+        self.values = list(map(sys.intern, values))
+        self.n = len(self.types)  # token lists are never resized, so bounds checks use this
         self.pos = 0
-        self.errors = []
+        self.depth = 0
+        self.err_count = 0
+        self._err_records = []
         self.has_main = False
+        
+        # Statements introduced by a keyword, keyed by that keyword
+        self._kw_stmt = {
+            _IF: self.parse_if_statement,
+            _WHILE: self.parse_while_statement,
+            _FOR: self.parse_for_statement,
+            _RETURN: self.parse_return_statement,
+        }
+    
+    @property
+    def errors(self):
+        """Error messages, in the order they were found"""
+        return [ERROR_FORMATS[code] % args for code, args in self._err_records]
+    
+    def add_error(self, code, *args):
+        """Record an error; see ERROR_FORMATS for the args each code takes"""
+        self.err_count += 1
+        self._err_records.append((code, args))
     
     # ===== Token Navigation =====
     
     def current(self):
-        """Get current token"""
-        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+        """Get current token (built on demand, for error reporting)"""
+        p = self.pos
+        return Token(self.types[p], self.values[p]) if p < self.n else None
     
     def peek(self, offset=1):
         """Look ahead at token"""
         idx = self.pos + offset
-        return self.tokens[idx] if idx < len(self.tokens) else None
+        return Token(self.types[idx], self.values[idx]) if idx < self.n else None
     
     def advance(self):
         """Move to next token"""
         self.pos += 1
     
     def match(self, token_type=None, value=None):
-        """Check if current token matches without consuming"""
-        tok = self.current()
-        if not tok:
-            return False
-        if token_type and tok.type != token_type:
-            return False
-        if value and tok.value != value:
-            return False
-        return True
+        """Check if current token matches without consuming
+        
+        token_type and value must be interned (the module constants above).
+        """
+        p = self.pos
+        return (p < self.n
+                and (token_type is None or self.types[p] is token_type)
+                and (value is None or self.values[p] is value))
     
     def consume(self, token_type=None, value=None, error_msg=None):
         """Match and consume token, or add error"""
-        if self.match(token_type, value):
-            self.advance()
+        p = self.pos
+        if (p < self.n
+                and (token_type is None or self.types[p] is token_type)
+                and (value is None or self.values[p] is value)):
+            self.pos = p + 1
             return True
-        
-        tok = self.current()
+        return self._consume_error(token_type, value, error_msg)
+    
+    def _consume_error(self, token_type, value, error_msg):
+        """Record why consume() failed; kept out of consume's success path"""
+        p = self.pos
         if error_msg:
-            msg = error_msg
-        elif not tok:
-            msg = "Unexpected end of file"
+            self.add_error(E_CONSUME, p, error_msg)
+        elif p >= self.n:
+            self.add_error(E_CONSUME_EOF, p)
         elif token_type and value:
-            msg = f"Expected {token_type} '{value}', got {tok.type} '{tok.value}'"
+            self.add_error(E_EXPECTED_VALUE, p, token_type, value, self.types[p], self.values[p])
         elif token_type:
-            msg = f"Expected {token_type}, got {tok.type}"
+            self.add_error(E_EXPECTED_TYPE, p, token_type, self.types[p])
         else:
-            msg = f"Unexpected token: {tok.type} '{tok.value}'"
-        
-        self.errors.append(f"At position {self.pos}: {msg}")
+            self.add_error(E_UNEXPECTED, p, self.types[p], self.values[p])
         return False
     
     # ===== Main Entry Point =====
     
     def parse(self):
         """Parse entire program"""
-        try:
-            while self.current():
-                self.parse_global_declaration()
-            
-            if not self.has_main:
-                self.errors.append("Missing main function")
-            
-            return len(self.errors) == 0
-        except Exception as e:
-            self.errors.append(f"Parser exception: {str(e)}")
-            return False
+        n = self.n
+        while self.pos < n:
+            self.parse_global_declaration()
+        
+        if not self.has_main:
+            self.add_error(E_MISSING_MAIN)
+        
+        return self.err_count == 0
     
     # ===== Top Level =====
     
     def parse_global_declaration(self):
         """Parse global variable or function"""
-        if not self.match('KEYWORD') or self.current().value not in ['int', 'float', 'double', 'char']:
-            self.errors.append("Expected datatype for global declaration")
+        if not self.match(_KW) or self.values[self.pos] not in _DATATYPES:
+            self.add_error(E_GLOBAL_DATATYPE)
             self.advance()  # Skip invalid token
             return
         
         # Check if it's a function (has '(' after identifier)
-        if self.peek(2) and self.peek(2).type == 'SPECIAL CHARACTER' and self.peek(2).value == '(':
+        if self.is_function_start():
             self.parse_function()
         else:
             self.parse_global_variable()
     
+    def is_function_start(self):
+        """Check for '(' two tokens ahead: datatype id ("""
+        p = self.pos + 2
+        return p < self.n and self.types[p] is _SC and self.values[p] is _LPAREN
+    
     def parse_global_variable(self):
         """Parse: datatype id [= expr] [, id [= expr]]* ;"""
         self.advance()  # Skip datatype
-        self.consume('IDENTIFIER')
+        self.consume(_ID)
         
         # Optional initialization
-        if self.match('OPERATOR', '='):
+        if self.match(_OP, _ASSIGN):
             self.advance()
             self.parse_expression()
         
         # Additional variables
-        while self.match('SPECIAL CHARACTER', ','):
+        while self.match(_SC, _COMMA):
             self.advance()
-            self.consume('IDENTIFIER')
-            if self.match('OPERATOR', '='):
+            self.consume(_ID)
+            if self.match(_OP, _ASSIGN):
                 self.advance()
                 self.parse_expression()
         
-        self.consume('SPECIAL CHARACTER', ';')
+        self.consume(_SC, _SEMI)
     
     def parse_function(self):
         """Parse: datatype id() { ... }"""
         self.advance()  # Skip datatype
         
-        tok = self.current()
-        if tok and tok.value == 'main':
+        if self.match(value=_MAIN):
             self.has_main = True
         
         self.consume()  # Function name
-        self.consume('SPECIAL CHARACTER', '(')
-        self.consume('SPECIAL CHARACTER', ')')
+        self.consume(_SC, _LPAREN)
+        self.consume(_SC, _RPAREN)
         self.parse_block()
     
     # ===== Statements =====
     
     def parse_block(self):
         """Parse: { statement* }"""
-        self.consume('SPECIAL CHARACTER', '{')
+        self.consume(_SC, _LBRACE)
         
-        while not self.match('SPECIAL CHARACTER', '}'):
-            if not self.current():
-                self.errors.append("Expected '}' to close block")
+        types, values, n = self.types, self.values, self.n
+        while True:
+            p = self.pos
+            if p >= n:
+                self.add_error(E_UNCLOSED_BLOCK)
                 return
+            if types[p] is _SC and values[p] is _RBRACE:
+                break
             self.parse_statement()
         
-        self.consume('SPECIAL CHARACTER', '}')
+        self.pos = p + 1
     
     def parse_statement(self):
         """Parse any statement"""
-        tok = self.current()
-        if not tok:
+        p = self.pos
+        if p >= self.n:
             return
+        tok_type = self.types[p]
+        tok_value = self.values[p]
+        
+        self.depth += 1
+        if self.depth > MAX_NESTING:
+            raise RecursionError("maximum recursion depth exceeded")
+        
+        # Control flow
+        handler = self._kw_stmt.get(tok_value) if tok_type is _KW else None
+        if handler:
+            handler()
         
         # Variable declaration or nested function
-        if tok.type == 'KEYWORD' and tok.value in ['int', 'float', 'double', 'char']:
-            if self.peek(2) and self.peek(2).type == 'SPECIAL CHARACTER' and self.peek(2).value == '(':
+        elif tok_type is _KW and tok_value in _DATATYPES:
+            if self.is_function_start():
                 self.parse_function()
             else:
                 self.parse_assignment()
         
-        # Control flow
-        elif tok.type == 'KEYWORD' and tok.value == 'if':
-            self.parse_if_statement()
-        elif tok.type == 'KEYWORD' and tok.value == 'while':
-            self.parse_while_statement()
-        elif tok.type == 'KEYWORD' and tok.value == 'for':
-            self.parse_for_statement()
-        elif tok.type == 'KEYWORD' and tok.value == 'return':
-            self.parse_return_statement()
-        
         # Assignment or expression
-        elif tok.type == 'IDENTIFIER':
-            if self.peek() and self.peek().type == 'OPERATOR' and self.peek().value == '=':
+        elif tok_type is _ID:
+            if p + 1 < self.n and self.types[p + 1] is _OP and self.values[p + 1] is _ASSIGN:
                 self.parse_assignment()
             else:
                 self.parse_expression()
-                self.consume('SPECIAL CHARACTER', ';')
+                self.consume(_SC, _SEMI)
         
         else:
-            self.errors.append(f"Invalid statement starting with {tok.type} '{tok.value}'")
+            self.add_error(E_INVALID_STATEMENT, tok_type, tok_value)
             self.advance()
+        
+        self.depth -= 1
     
     def parse_assignment(self):
         """Parse: [datatype] id [= expr] [, id [= expr]]* ;"""
         # Optional datatype
-        if self.match('KEYWORD') and self.current().value in ['int', 'float', 'double', 'char']:
+        if self.match(_KW) and self.values[self.pos] in _DATATYPES:
             has_datatype = True
             self.advance()
         else:
             has_datatype = False
         
-        self.consume('IDENTIFIER')
+        self.consume(_ID)
         
         # For declarations, allow multiple variables
         if has_datatype:
-            while self.match('SPECIAL CHARACTER', ','):
+            while self.match(_SC, _COMMA):
                 self.advance()
-                self.consume('IDENTIFIER')
-                if self.match('OPERATOR', '='):
+                self.consume(_ID)
+                if self.match(_OP, _ASSIGN):
                     self.advance()
                     self.parse_expression()
         
         # Assignment
-        if self.match('OPERATOR', '='):
+        if self.match(_OP, _ASSIGN):
             self.advance()
             self.parse_expression()
         
-        self.consume('SPECIAL CHARACTER', ';')
+        self.consume(_SC, _SEMI)
     
     def parse_if_statement(self):
         """Parse: if (expr) statement [else statement]"""
         self.advance()  # Skip 'if'
-        self.consume('SPECIAL CHARACTER', '(')
+        self.consume(_SC, _LPAREN)
         self.parse_expression()
-        self.consume('SPECIAL CHARACTER', ')')
+        self.consume(_SC, _RPAREN)
         
         # Then branch
-        if self.match('SPECIAL CHARACTER', '{'):
+        if self.match(_SC, _LBRACE):
             self.parse_block()
         else:
             self.parse_statement()
         
         # Else branch
-        if self.match('KEYWORD', 'else'):
+        if self.match(_KW, _ELSE):
             self.advance()
-            if self.match('SPECIAL CHARACTER', '{'):
+            if self.match(_SC, _LBRACE):
                 self.parse_block()
             else:
                 self.parse_statement()
@@ -238,11 +372,11 @@ class Parser:
     def parse_while_statement(self):
         """Parse: while (expr) statement"""
         self.advance()  # Skip 'while'
-        self.consume('SPECIAL CHARACTER', '(')
+        self.consume(_SC, _LPAREN)
         self.parse_expression()
-        self.consume('SPECIAL CHARACTER', ')')
+        self.consume(_SC, _RPAREN)
         
-        if self.match('SPECIAL CHARACTER', '{'):
+        if self.match(_SC, _LBRACE):
             self.parse_block()
         else:
             self.parse_statement()
@@ -250,29 +384,29 @@ class Parser:
     def parse_for_statement(self):
         """Parse: for (init; cond; update) statement"""
         self.advance()  # Skip 'for'
-        self.consume('SPECIAL CHARACTER', '(')
+        self.consume(_SC, _LPAREN)
         
         # Init (can be declaration or expression)
-        if self.match('KEYWORD'):
+        if self.match(_KW):
             self.parse_assignment()
-        elif not self.match('SPECIAL CHARACTER', ';'):
+        elif not self.match(_SC, _SEMI):
             self.parse_expression()
-            self.consume('SPECIAL CHARACTER', ';')
+            self.consume(_SC, _SEMI)
         else:
-            self.consume('SPECIAL CHARACTER', ';')
+            self.consume(_SC, _SEMI)
         
         # Condition
-        if not self.match('SPECIAL CHARACTER', ';'):
+        if not self.match(_SC, _SEMI):
             self.parse_expression()
-        self.consume('SPECIAL CHARACTER', ';')
+        self.consume(_SC, _SEMI)
         
         # Update
-        if not self.match('SPECIAL CHARACTER', ')'):
+        if not self.match(_SC, _RPAREN):
             self.parse_expression()
         
-        self.consume('SPECIAL CHARACTER', ')')
+        self.consume(_SC, _RPAREN)
         
-        if self.match('SPECIAL CHARACTER', '{'):
+        if self.match(_SC, _LBRACE):
             self.parse_block()
         else:
             self.parse_statement()
@@ -281,137 +415,121 @@ class Parser:
         """Parse: return [expr] ;"""
         self.advance()  # Skip 'return'
         
-        if not self.match('SPECIAL CHARACTER', ';'):
+        if not self.match(_SC, _SEMI):
             self.parse_expression()
         
-        self.consume('SPECIAL CHARACTER', ';')
+        self.consume(_SC, _SEMI)
     
-    # ===== Expressions (Precedence Climbing) =====
+    # ===== Expressions =====
     
     def parse_expression(self):
         """Parse full expression"""
-        self.parse_logical_or()
-    
-    def parse_logical_or(self):
-        """Parse: logical_and (|| logical_and)*"""
-        self.parse_logical_and()
-        while self.match('OPERATOR', '||'):
-            self.advance()
-            self.parse_logical_and()
-    
-    def parse_logical_and(self):
-        """Parse: equality (&& equality)*"""
-        self.parse_equality()
-        while self.match('OPERATOR', '&&'):
-            self.advance()
-            self.parse_equality()
-    
-    def parse_equality(self):
-        """Parse: relational ((==|!=) relational)*"""
-        self.parse_relational()
-        while self.match('OPERATOR') and self.current().value in ['==', '!=']:
-            self.advance()
-            self.parse_relational()
-    
-    def parse_relational(self):
-        """Parse: additive ((<|>|<=|>=) additive)*"""
-        self.parse_additive()
-        while self.match('OPERATOR') and self.current().value in ['<', '>', '<=', '>=']:
-            self.advance()
-            self.parse_additive()
-    
-    def parse_additive(self):
-        """Parse: multiplicative ((+|-) multiplicative)*"""
-        self.parse_multiplicative()
-        while self.match('OPERATOR') and self.current().value in ['+', '-']:
-            self.advance()
-            self.parse_multiplicative()
+        self.depth += 1
+        if self.depth > MAX_NESTING:
+            raise RecursionError("maximum recursion depth exceeded")
+        
+        self.parse_binary()
+        self.depth -= 1
     
-    def parse_multiplicative(self):
-        """Parse: unary ((*|/|%) unary)*"""
+    def parse_binary(self):
+        """Parse: unary (binop unary)*
+        
+        No tree is built, so precedence does not change which tokens are
+        consumed and every binary operator is accepted alike.
+        """
+        types, values, n = self.types, self.values, self.n
         self.parse_unary()
-        while self.match('OPERATOR') and self.current().value in ['*', '/', '%']:
-            self.advance()
+        p = self.pos
+        while p < n and types[p] is _OP and values[p] in _BINARY:
+            self.pos = p + 1
             self.parse_unary()
+            p = self.pos
     
     def parse_unary(self):
         """Parse: (+|-|++|--|!)* postfix"""
-        if self.match('OPERATOR') and self.current().value in ['+', '-', '++', '--', '!']:
-            self.advance()
-            self.parse_unary()
-        else:
-            self.parse_postfix()
+        types, values, n = self.types, self.values, self.n
+        p = self.pos
+        while p < n and types[p] is _OP and values[p] in _UNARY:
+            p += 1
+        self.pos = p
+        self.parse_postfix()
     
     def parse_postfix(self):
         """Parse: primary ([expr] | (args) | ++ | --)*"""
+        types, values, n = self.types, self.values, self.n
         self.parse_primary()
         
-        while self.current():
+        while True:
+            p = self.pos
+            if p >= n:
+                break
+            tok_type = types[p]
+            tok_value = values[p]
+            
             # Array subscript
-            if self.match('SPECIAL CHARACTER', '['):
-                self.advance()
+            if tok_type is _SC and tok_value is _LBRACKET:
+                self.pos = p + 1
                 self.parse_expression()
-                self.consume('SPECIAL CHARACTER', ']')
+                self.consume(_SC, _RBRACKET)
             
             # Function call
-            elif self.match('SPECIAL CHARACTER', '('):
-                self.advance()
+            elif tok_type is _SC and tok_value is _LPAREN:
+                self.pos = p + 1
                 self.parse_argument_list()
-                self.consume('SPECIAL CHARACTER', ')')
+                self.consume(_SC, _RPAREN)
             
             # Post increment/decrement
-            elif self.match('OPERATOR') and self.current().value in ['++', '--']:
-                self.advance()
+            elif tok_type is _OP and tok_value in _POST:
+                self.pos = p + 1
             
             else:
                 break
     
     def parse_argument_list(self):
         """Parse: [expr (, expr)*]"""
-        if self.match('SPECIAL CHARACTER', ')'):
+        if self.match(_SC, _RPAREN):
             return
         
         self.parse_expression()
-        while self.match('SPECIAL CHARACTER', ','):
+        while self.match(_SC, _COMMA):
             self.advance()
             self.parse_expression()
     
     def parse_primary(self):
         """Parse: identifier | number | string | (expr)"""
-        tok = self.current()
-        
-        if not tok:
-            self.errors.append("Unexpected end of file in expression")
+        p = self.pos
+        if p >= self.n:
+            self.add_error(E_EXPRESSION_EOF)
             return
         
-        if tok.type in ['IDENTIFIER', 'NUMBER', 'STRING']:
-            self.advance()
-        elif self.match('SPECIAL CHARACTER', '('):
-            self.advance()
+        tok_type = self.types[p]
+        if tok_type in _OPERAND_TYPES:
+            self.pos = p + 1
+        elif tok_type is _SC and self.values[p] is _LPAREN:
+            self.pos = p + 1
             self.parse_expression()
-            self.consume('SPECIAL CHARACTER', ')')
+            self.consume(_SC, _RPAREN)
         else:
-            self.errors.append(f"Unexpected token in expression: {tok.type} '{tok.value}'")
-            self.advance()
-
+            self.add_error(E_EXPRESSION_TOKEN, tok_type, self.values[p])
+            self.pos = p + 1
 
 def parse_cpp_tokens(filename):
     """Main function to parse C++ tokens from file"""
     try:
-        tokens = read_tokens_from_file(filename)
+        types, values = read_tokens_from_file(filename)
         
-        if not tokens:
+        if not types:
             return False, ["No tokens found in file"]
         
-        parser = Parser(tokens)
+        parser = Parser(types, values)
         is_valid = parser.parse()
         
         return is_valid, parser.errors
     
     except FileNotFoundError:
-        return False, [f"File not found: {filename}"]
+        return False, ["File not found: %s" % filename]
     except Exception as e:
-        return False, [f"Error: {str(e)}"]
+        return False, ["Error: %s" % e]
 
 
 if __name__ == "__main__":
@@ -0,0 +1,53 @@
+"""Optional native build of the C++ token parser.
+
+``python setup.py build_ext --inplace`` compiles ``cpp_parser.py`` and
+``new_parse.py`` with Cython, using the static types declared in the
+matching ``.pxd`` files. The resulting extension modules are imported in
+preference to the ``.py`` files, so scripts keep doing
+``from cpp_parser import parse_cpp_tokens`` either way.
+
+Set ``CPP_PARSER_CYTHON=0`` to skip the build. It is also skipped, with a
+warning, when Cython or a C compiler is not available; the pure Python
+parsers are then used unchanged.
+"""
+import os
+import sys
+
+from setuptools import setup
+from setuptools.command.build_ext import build_ext
+
+
+class optional_build_ext(build_ext):
+    def run(self):
+        try:
+            build_ext.run(self)
+        except Exception as e:
+            self.warn_fallback(e)
+
+    def build_extension(self, ext):
+        try:
+            build_ext.build_extension(self, ext)
+        except Exception as e:
+            self.warn_fallback(e)
+
+    def warn_fallback(self, e):
+        sys.stderr.write(f"warning: native parsers not built ({e}); using the .py sources\n")
+
+
+def native_extensions():
+    if os.environ.get("CPP_PARSER_CYTHON", "1") == "0":
+        return []
+    try:
+        from Cython.Build import cythonize
+    except ImportError:
+        sys.stderr.write("warning: Cython not installed; using the .py sources\n")
+        return []
+    return cythonize(["cpp_parser.py", "new_parse.py"], language_level=3)
+
+
+setup(
+    name="cpp-parser",
+    py_modules=["cpp_parser", "new_parse", "scanner"],
+    ext_modules=native_extensions(),
+    cmdclass={"build_ext": optional_build_ext},
+)
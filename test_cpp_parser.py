@@ -0,0 +1,35 @@
+"""Regression checks for cpp_parser. Run with pytest."""
+import os
+
+import pytest
+
+import cpp_parser
+
+TOKEN_FILE = os.path.join(os.path.dirname(__file__), "text.txt")
+
+
+def full_and_first_errors(tokens):
+    full = cpp_parser.Parser(tokens)
+    full.parse()
+    first = cpp_parser.Parser(tokens, max_errors=1)
+    first.parse()
+    return full.format_errors(), first.format_errors()
+
+
+def test_max_errors_1_reports_first_error_of_full_parse():
+    tokens = cpp_parser.read_tokens_from_file(TOKEN_FILE)
+    checked = 0
+    # Dropping one token at a time gives inputs that fail in many places,
+    # most of them with several errors.
+    for i in range(len(tokens)):
+        full, first = full_and_first_errors(tokens[:i] + tokens[i + 1:])
+        if full:
+            assert first == full[:1]
+            checked += 1
+    assert checked
+
+
+def test_max_errors_below_1_is_rejected():
+    for max_errors in (0, -1):
+        with pytest.raises(ValueError):
+            cpp_parser.Parser([], max_errors)
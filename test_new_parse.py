@@ -0,0 +1,118 @@
+"""Regression checks for new_parse. Run with pytest."""
+import os
+import sys
+
+import pytest
+
+import new_parse
+
+TOKEN_FILE = os.path.join(os.path.dirname(__file__), "text.txt")
+
+# int main ( ) { ... }, around the tokens of a function body.
+MAIN_START = [
+    ("KEYWORD", "int"), ("KEYWORD", "main"),
+    ("SPECIAL CHARACTER", "("), ("SPECIAL CHARACTER", ")"), ("SPECIAL CHARACTER", "{"),
+]
+MAIN_END = [("SPECIAL CHARACTER", "}")]
+
+
+def main_with(body):
+    tokens = MAIN_START + body + MAIN_END
+    return [token_type for token_type, _ in tokens], [value for _, value in tokens]
+
+
+def write_tokens(tmp_path, lines):
+    path = tmp_path / "tokens.txt"
+    path.write_text("".join(line + "\n" for line in lines))
+    return str(path)
+
+
+def copy_strings(strings):
+    # Slicing builds a new str object, so none of these are interned.
+    return [(s + " ")[:-1] for s in strings]
+
+
+def test_parser_accepts_strings_that_are_not_interned():
+    types, values = new_parse.read_tokens_from_file(TOKEN_FILE)
+    types, values = copy_strings(types), copy_strings(values)
+    assert any(t is not sys.intern(t) for t in types)
+    
+    parser = new_parse.Parser(types, values)
+    assert parser.parse() is True
+    assert parser.errors == []
+
+
+def test_read_tokens_returns_parallel_lists(tmp_path):
+    path = write_tokens(tmp_path, [
+        "<KEYWORD, int>",
+        "  <OPERATOR, >>  ",
+        "<STRING, a, b>",
+    ])
+    types, values = new_parse.read_tokens_from_file(path)
+    assert types == ["KEYWORD", "OPERATOR", "STRING"]
+    assert values == ["int", ">", "a, b"]
+    
+    parser = new_parse.Parser(types, values)
+    assert (parser.current().type, parser.current().value) == ("KEYWORD", "int")
+    assert parser.peek(2).value == "a, b"
+    assert parser.peek(3) is None
+
+
+def test_malformed_token_among_valid_lines_is_reported(tmp_path):
+    path = write_tokens(tmp_path, ["<KEYWORD, int>", "<IDENTIFIER x>", "<SPECIAL CHARACTER, ;>"])
+    with pytest.raises(ValueError, match="Malformed token: <IDENTIFIER x>"):
+        new_parse.read_tokens_from_file(path)
+    
+    assert new_parse.parse_cpp_tokens(path) == (False, ["Error: Malformed token: <IDENTIFIER x>"])
+
+
+def test_lines_that_are_not_tokens_are_ignored(tmp_path):
+    path = write_tokens(tmp_path, ["<KEYWORD, int>", "", "not a token", "<IDENTIFIER, x>"])
+    assert new_parse.read_tokens_from_file(path) == (["KEYWORD", "IDENTIFIER"], ["int", "x"])
+
+
+def test_errors_are_formatted_from_codes():
+    # int main() { x = ; }
+    parser = new_parse.Parser(*main_with([
+        ("IDENTIFIER", "x"), ("OPERATOR", "="), ("SPECIAL CHARACTER", ";"),
+    ]))
+    assert parser.parse() is False
+    assert parser.err_count == 2
+    assert parser.errors == [
+        "Unexpected token in expression: SPECIAL CHARACTER ';'",
+        "At position 8: Expected SPECIAL CHARACTER ';', got SPECIAL CHARACTER '}'",
+    ]
+
+
+def test_deep_nesting_is_reported_by_parse_cpp_tokens(tmp_path):
+    # int main() { x = ((((...1...)))); } nested far past MAX_NESTING
+    depth = 5 * new_parse.MAX_NESTING
+    body = ([("IDENTIFIER", "x"), ("OPERATOR", "=")]
+            + [("SPECIAL CHARACTER", "(")] * depth + [("NUMBER", "1")]
+            + [("SPECIAL CHARACTER", ")")] * depth + [("SPECIAL CHARACTER", ";")])
+    types, values = main_with(body)
+    path = write_tokens(tmp_path, ["<%s, %s>" % token for token in zip(types, values)])
+    
+    is_valid, errors = new_parse.parse_cpp_tokens(path)
+    assert is_valid is False
+    assert len(errors) == 1
+    assert errors[0].startswith("Error: maximum recursion depth exceeded")
+
+
+def test_new_line_tokens_are_dropped(tmp_path):
+    with open(TOKEN_FILE) as f:
+        lines = [line.strip() for line in f if line.strip()]
+    broken = lines[:6] + lines[7:]
+    
+    results = []
+    for source in (lines, broken):
+        interleaved = []
+        for line in source:
+            interleaved += [line, "<NEW LINE, \\n>"]
+        plain = new_parse.parse_cpp_tokens(write_tokens(tmp_path, source))
+        assert new_parse.parse_cpp_tokens(write_tokens(tmp_path, interleaved)) == plain
+        results.append(plain)
+    
+    # Positions in the errors count tokens after NEW LINE lines are dropped.
+    assert results[0] == (True, [])
+    assert any(error.startswith("At position") for error in results[1][1])